@@ -1,73 +1,92 @@
-from copy import copy
+import asyncio
+from importlib.util import find_spec
 
-from fastapi import APIRouter, FastAPI, Response
-from fastapi import HTTPException as FastApiHTTPException
+from fastapi import FastAPI, Response
 from fastapi.requests import Request
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.routing import APIRoute
-from fastapi.staticfiles import StaticFiles
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app_distribution_server.config import (
     APP_TITLE,
     APP_VERSION,
 )
-from app_distribution_server.errors import (
-    UserError,
-    status_codes_to_default_exception_types,
-)
+from app_distribution_server.dispatch import install_route_index
+from app_distribution_server.errors import get_user_facing_error
+from app_distribution_server.logger import logger
+from app_distribution_server.openapi import install_cached_openapi_route
 from app_distribution_server.routers import api_router, app_files_router, health_router, html_router
+from app_distribution_server.static_files import CachedStaticFiles
 
 app = FastAPI(
     title=APP_TITLE,
     version=APP_VERSION,
     summary="Simple, self-hosted iOS/Android app distribution server.",
     description="[Source code, issues and documentation](https://github.com/significa/app-distribution-server)",
+    default_response_class=ORJSONResponse,
 )
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
-
 
-def add_head_routes(router: APIRouter) -> APIRouter:
+def warn_about_slow_server_runtime():
     """
-    Creates HEAD routes for all the GET routes in the given router.
-    The route is handled by the same handler.
-    Waiting on: https://github.com/fastapi/fastapi/issues/1773
+    Uvicorn only uses uvloop and httptools when they are installed, and silently falls back to
+    the (much slower) asyncio event loop and h11 parser otherwise.
     """
-    for route in router.routes:
-        if isinstance(route, APIRoute) and "GET" in route.methods:
-            new_route = copy(route)
-            new_route.methods = {"HEAD"}
-            new_route.include_in_schema = False
-            router.routes.append(new_route)
+    try:
+        event_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # Not being served (ex: imported by tooling or tests)
+
+    if "uvloop" not in type(event_loop).__module__:
+        logger.warning("PERFORMANCE WARNING: uvloop is not active, expect a lower throughput.")
+
+    if find_spec("httptools") is None:
+        logger.warning(
+            "PERFORMANCE WARNING: httptools is not installed, expect a lower throughput."
+        )
 
-    return router
 
+warn_about_slow_server_runtime()
+
+app.mount("/static", CachedStaticFiles(directory="static"), name="static")
 
 app.include_router(api_router.router)
-app.include_router(add_head_routes(html_router.router))
-app.include_router(add_head_routes(app_files_router.router))
+
+html_routes_start = len(app.router.routes)
+app.include_router(html_router.router)
+app.include_router(app_files_router.router)
+html_routes = app.router.routes[html_routes_start:]
+
 app.include_router(health_router.router)
 
+# The schema is generated before HEAD is added, so that only the GET operations are documented
+install_cached_openapi_route(app)
 
-@app.exception_handler(UserError)
-async def exception_handler(
-    request: Request,
-    exception: FastApiHTTPException | StarletteHTTPException,
-) -> Response:
-    if request.url.path.startswith("/api/"):
-        return PlainTextResponse(content=exception.detail)
+# The HTML routes handle HEAD requests with their GET handler, by extending their methods in place.
+# This is done on the app's routes, as `include_router` rebuilds each route and would derive its
+# operation ID from an arbitrary method. Waiting on: https://github.com/fastapi/fastapi/issues/1773
+for route in html_routes:
+    if isinstance(route, APIRoute) and "GET" in route.methods:
+        route.methods.add("HEAD")
+
+install_route_index(app.router)
+
+API_PATH_PREFIX = "/api/"
 
-    return await html_router.render_error_page(request, exception)
+
+# The routers render the errors of their own routes, this handles the ones raised outside
+# of them (ex: no route found or method not allowed). User errors are HTTP exceptions as well.
 
 
 @app.exception_handler(StarletteHTTPException)
-async def starlette_exception_handler(
+async def exception_handler(
     request: Request,
     exception: StarletteHTTPException,
 ) -> Response:
-    filtered_exception = status_codes_to_default_exception_types.get(exception.status_code)
-    if filtered_exception:
-        return await exception_handler(request, filtered_exception())
+    user_error = get_user_facing_error(exception)
+
+    # Read from the scope, as `request.url` would parse the whole URL
+    if request.scope["path"].startswith(API_PATH_PREFIX):
+        return await api_router.render_plain_text_error(request, user_error)
 
-    return await exception_handler(request, exception)
+    return await html_router.render_error_page(request, user_error)
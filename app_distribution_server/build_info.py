@@ -1,4 +1,3 @@
-import io
 import os
 import plistlib
 import re
@@ -7,7 +6,7 @@ import tempfile
 import zipfile
 from datetime import datetime, timezone
 from enum import Enum
-from io import BytesIO
+from typing import BinaryIO
 from uuid import uuid4
 
 from androguard.core.apk import APK, get_apkid
@@ -38,6 +37,9 @@ class Platform(str, Enum):
         return match[self]
 
 
+BUNDLE_ID_REGEX = re.compile(r"^[a-zA-Z0-9._-]{1,256}$")
+
+
 class LegacyAppInfo(BaseModel):
     """
     This was the structure used by v1.
@@ -50,7 +52,7 @@ class LegacyAppInfo(BaseModel):
 
     @field_validator("bundle_id")
     def validate_bundle_id(cls, v):
-        if not re.match(r"^[a-zA-Z0-9\.\-\_]{1,256}$", v):
+        if not BUNDLE_ID_REGEX.match(v):
             raise ValueError(
                 "Bundle ID can only contain alphanumeric characters, dots, hyphens and underscores."
             )
@@ -82,10 +84,23 @@ class BuildInfo(LegacyAppInfo):
         return f"{self.file_size / one_kb**3:.2f}GB"
 
 
+# Size of the chunks app files are copied by, so that they are never fully loaded in memory
+APP_FILE_CHUNK_SIZE = 1024**2
+
+
+def get_file_size(file: BinaryIO) -> int:
+    file.seek(0, os.SEEK_END)
+    file_size = file.tell()
+    file.seek(0)
+    return file_size
+
+
 def get_build_info_from_ipa(
     upload_id: str,
-    ipa_file: BytesIO,
+    ipa_file: BinaryIO,
 ) -> BuildInfo:
+    file_size = get_file_size(ipa_file)
+
     with zipfile.ZipFile(ipa_file, "r") as ipa:
         for file in ipa.namelist():
             if file.endswith(".app/Info.plist"):
@@ -107,24 +122,43 @@ def get_build_info_from_ipa(
                     bundle_id=bundle_id,
                     bundle_version=bundle_version,
                     created_at=datetime.now(timezone.utc),
-                    file_size=ipa_file.getbuffer().nbytes,
+                    file_size=file_size,
                 )
 
     logger.error("Could not find plist file in bundle")
     raise InvalidFileTypeError()
 
 
+APK_MANIFEST_FILE_NAME = "AndroidManifest.xml"
+# Members of an APK its build info is read from (the app title may be a string resource)
+APK_BUILD_INFO_FILE_NAMES = (APK_MANIFEST_FILE_NAME, "resources.arsc")
+
+
 def get_build_info_from_apk(
     upload_id: str,
-    apk_file: BytesIO,
+    apk_file: BinaryIO,
 ) -> BuildInfo:
+    file_size = get_file_size(apk_file)
     tempdir = tempfile.mkdtemp()
     file_name = "app.apk"
     file_path = os.path.join(tempdir, file_name)
 
     try:
-        with open(file_path, "wb") as f:
-            f.write(apk_file.read())
+        # Only the parsed members are copied over, rather than the whole app, to a stripped down
+        # APK that androguard can load in memory (it reads all of the file it's given)
+        with zipfile.ZipFile(apk_file, "r") as apk, zipfile.ZipFile(file_path, "w") as stripped_apk:
+            apk_file_names = set(apk.namelist())
+
+            if APK_MANIFEST_FILE_NAME not in apk_file_names:
+                logger.error("Could not find manifest file in bundle")
+                raise InvalidFileTypeError()
+
+            for member_name in APK_BUILD_INFO_FILE_NAMES:
+                if member_name not in apk_file_names:
+                    continue
+
+                with apk.open(member_name) as src, stripped_apk.open(member_name, "w") as dst:
+                    shutil.copyfileobj(src, dst, APP_FILE_CHUNK_SIZE)
 
         bundle_id, _, version_name = get_apkid(file_path)
         apk = APK(file_path)
@@ -137,7 +171,7 @@ def get_build_info_from_apk(
             bundle_id=bundle_id,
             bundle_version=version_name,
             created_at=datetime.now(timezone.utc),
-            file_size=apk_file.getbuffer().nbytes,
+            file_size=file_size,
         )
     finally:
         shutil.rmtree(tempdir)
@@ -145,21 +179,19 @@ def get_build_info_from_apk(
 
 def get_build_info(
     platform: Platform,
-    app_file_content: bytes,
+    app_file: BinaryIO,
 ):
     upload_id = str(uuid4())
 
     logger.debug(f"Obtaining build info from {upload_id!r}")
 
-    file_contents_stream = io.BytesIO(app_file_content)
-
     if platform == Platform.ios:
         return get_build_info_from_ipa(
             upload_id,
-            file_contents_stream,
+            app_file,
         )
 
     return get_build_info_from_apk(
         upload_id,
-        file_contents_stream,
+        app_file,
     )
@@ -0,0 +1,77 @@
+"""
+Compression of the response bodies that don't change while the server is running
+(ex: static files, prerendered pages), done once on startup rather than on every request.
+"""
+
+import gzip
+from functools import lru_cache
+
+import brotli
+
+# Preferred first, when the client accepts several of them
+CONTENT_ENCODINGS = ("br", "gzip")
+
+
+def compress(body: bytes, content_encoding: str) -> bytes:
+    if content_encoding == "br":
+        return brotli.compress(body, quality=11)
+
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+class PrecompressedBody:
+    def __init__(self, body: bytes):
+        self.body = body
+        self.compressed_bodies: dict[str, bytes] = {}
+
+        for content_encoding in CONTENT_ENCODINGS:
+            compressed_body = compress(body, content_encoding)
+            # Tiny bodies may not get any smaller
+            if len(compressed_body) < len(body):
+                self.compressed_bodies[content_encoding] = compressed_body
+
+    def get_encoded_body(self, accept_encoding: str) -> tuple[bytes, str | None]:
+        """
+        Returns the smallest version of the body accepted by the client,
+        along with its content encoding (`None` for the body as is).
+        """
+        for content_encoding in get_accepted_content_encodings(accept_encoding):
+            compressed_body = self.compressed_bodies.get(content_encoding)
+            if compressed_body is not None:
+                return compressed_body, content_encoding
+
+        return self.body, None
+
+
+@lru_cache(maxsize=64)
+def get_accepted_content_encodings(accept_encoding: str) -> tuple[str, ...]:
+    """
+    Parses an `Accept-Encoding` header into the supported content encodings it accepts,
+    by order of preference. Encodings with `q=0` are refused, and `*` accepts the unlisted ones.
+    """
+    qualities: dict[str, float] = {}
+
+    for coding in accept_encoding.lower().split(","):
+        name, _, params = coding.partition(";")
+        quality = 1.0
+
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        qualities[name.strip()] = quality
+
+    wildcard_quality = qualities.get("*", 0.0)
+    accepted = [
+        content_encoding
+        for content_encoding in CONTENT_ENCODINGS
+        if qualities.get(content_encoding, wildcard_quality) > 0
+    ]
+    # Stable, so equally accepted encodings keep our preference order
+    accepted.sort(key=lambda content_encoding: -qualities.get(content_encoding, wildcard_quality))
+
+    return tuple(accepted)
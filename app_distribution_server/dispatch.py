@@ -0,0 +1,307 @@
+"""
+Request dispatch for the app's router.
+
+Starlette resolves a request by trying the regex of every route, in order, until one matches.
+`RouteIndex` instead resolves requests to routes without params (most of them) with a single
+lookup in a table precomputed at startup, and keeps the other routes in a trie keyed by path
+segment, so resolving a request takes one dict lookup per segment regardless of the amount of routes.
+On top of that, recently resolved requests are kept in a small direct-mapped cache.
+Routes that can't be expressed as plain segments (mounts, typed params or params mixed with text,
+like `app.{file_type}`) are matched by their regexes, fused in a single one per method, and whatever
+the index can't resolve (404, 405, slash redirects, ...) is handed over to Starlette's router untouched.
+"""
+
+import re
+import sys
+from collections.abc import Sequence
+
+from fastapi.routing import APIRoute
+from starlette.convertors import StringConvertor
+from starlette.routing import BaseRoute, Match, Mount, Route, Router, WebSocketRoute
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+PARAM_SEGMENT_REGEX = re.compile(r"^{([a-zA-Z_][a-zA-Z0-9_]*)}$")
+NAMED_GROUP_REGEX = re.compile(r"\(\?P<[a-zA-Z_][a-zA-Z0-9_]*>")
+
+# Amount of slots of the resolved routes cache, must be a power of two
+RESOLVED_CACHE_SIZE = 512
+
+
+class IndexedRoute:
+    def __init__(self, index: int, route: Route, param_names: tuple[str, ...]) -> None:
+        self.index = index
+        self.route = route
+        self.param_names = param_names
+
+
+class RouteNode:
+    def __init__(self) -> None:
+        self.children: dict[str, RouteNode] = {}
+        self.param_child: RouteNode | None = None
+        self.routes: list[IndexedRoute] = []
+
+    def insert(self, segments: list[str | None], indexed_route: IndexedRoute) -> None:
+        node = self
+        for segment in segments:
+            if segment is None:
+                if node.param_child is None:
+                    node.param_child = RouteNode()
+                node = node.param_child
+            else:
+                node = node.children.setdefault(sys.intern(segment), RouteNode())
+
+        node.routes.append(indexed_route)
+
+    def find(
+        self,
+        method: str,
+        segments: list[str],
+        depth: int = 0,
+    ) -> tuple[IndexedRoute, list[str]] | None:
+        """
+        Returns the first route (in registration order) matching the segments and method,
+        along with the values of its path params.
+        Both the literal and the param children are explored, as either may hold that route.
+        """
+        if depth == len(segments):
+            for indexed_route in self.routes:
+                methods = indexed_route.route.methods
+                if methods is None or method in methods:
+                    return indexed_route, []
+            return None
+
+        segment = segments[depth]
+        best = None
+
+        child = self.children.get(segment)
+        if child is not None:
+            best = child.find(method, segments, depth + 1)
+
+        if self.param_child is not None and segment:
+            found = self.param_child.find(method, segments, depth + 1)
+            if found is not None and (best is None or found[0].index < best[0].index):
+                found[1].insert(0, segment)
+                return found
+
+        return best
+
+
+def match_route(routes: Sequence[BaseRoute], scope: Scope) -> tuple[BaseRoute, Scope] | None:
+    """
+    Returns the first route fully matching the scope, along with its child scope.
+    This is how Starlette's router looks up routes.
+    """
+    for route in routes:
+        match, child_scope = route.matches(scope)
+        if match == Match.FULL:
+            return route, child_scope
+
+    return None
+
+
+def get_route_segments(route: BaseRoute) -> tuple[list[str | None], tuple[str, ...]] | None:
+    """
+    Splits the route path in segments, with `None` standing for a (string) path param,
+    and returns them along with the param names.
+    Returns `None` for routes that can't be represented this way.
+    """
+    if not isinstance(route, Route) or not route.path_format.startswith("/"):
+        return None
+
+    segments: list[str | None] = []
+    param_names: list[str] = []
+
+    for segment in route.path_format[1:].split("/"):
+        param_match = PARAM_SEGMENT_REGEX.match(segment)
+        if param_match:
+            param_name = param_match.group(1)
+            if not isinstance(route.param_convertors[param_name], StringConvertor):
+                return None
+            segments.append(None)
+            param_names.append(param_name)
+        elif "{" in segment or "}" in segment:
+            return None
+        else:
+            segments.append(segment)
+
+    return segments, tuple(param_names)
+
+
+def route_accepts_method(route: Route | Mount, method: str | None) -> bool:
+    """
+    Whether the route can fully match a request with the given method,
+    with `None` standing for any method other than the ones the routes were declared with.
+    """
+    if isinstance(route, Mount) or route.methods is None:
+        return True
+
+    return method is not None and method in route.methods
+
+
+def compile_fused_pattern(routes: list[tuple[int, Route | Mount]]) -> re.Pattern[str] | None:
+    """
+    Fuses the path regexes of the routes in a single alternation, tried in the given order.
+    The `lastgroup` of a match (`_<index>`) tells which route matched first.
+    """
+    if not routes:
+        return None
+
+    return re.compile(
+        "|".join(
+            f"(?P<_{index}>{NAMED_GROUP_REGEX.sub('(?:', route.path_regex.pattern)})"
+            for index, route in routes
+        )
+    )
+
+
+# (method, path), resolved route along with its child scope
+ResolvedCacheSlot = tuple[tuple[str, str], tuple[BaseRoute, Scope] | None]
+
+
+class RouteIndex:
+    """
+    ASGI app dispatching the requests of `router` through an index of its routes.
+    Must be built after all the routes have been added to the router.
+    """
+
+    def __init__(self, router: Router) -> None:
+        self.router = router
+        self.routes: tuple[BaseRoute, ...] = tuple(router.routes)
+        self.fallback: ASGIApp = router.app
+        self.root = RouteNode()
+        self.static_routes: dict[tuple[str, str], tuple[BaseRoute, Scope]] = {}
+        self.resolved_cache: list[ResolvedCacheSlot | None] = [None] * RESOLVED_CACHE_SIZE
+
+        complex_routes: list[tuple[int, Route | Mount]] = []
+
+        for index, route in enumerate(self.routes):
+            if isinstance(route, WebSocketRoute):
+                continue
+
+            if not isinstance(route, Route | Mount):
+                raise ValueError(f"Route not supported by the route index: {route!r}")
+
+            route_segments = get_route_segments(route)
+
+            if route_segments is None or not isinstance(route, Route):
+                complex_routes.append((index, route))
+                continue
+
+            segments, param_names = route_segments
+            if param_names or route.methods is None:
+                self.root.insert(segments, IndexedRoute(index, route, param_names))
+                continue
+
+            # Such a request always resolves the same way, so it's looked up ahead of time.
+            # Any request to this path with other methods does not match this route at all.
+            for method in route.methods:
+                static_scope: Scope = {
+                    "type": "http",
+                    "method": method,
+                    "path": route.path_format,
+                    "root_path": "",
+                }
+                resolved = match_route(self.routes, static_scope)
+                if resolved is not None:
+                    key = (sys.intern(method), sys.intern(route.path_format))
+                    self.static_routes[key] = resolved
+
+        complex_routes_methods = {
+            method
+            for _, route in complex_routes
+            if isinstance(route, Route) and route.methods
+            for method in route.methods
+        }
+        self.complex_routes_patterns: dict[str | None, re.Pattern[str] | None] = {
+            method: compile_fused_pattern(
+                [
+                    (index, route)
+                    for index, route in complex_routes
+                    if route_accepts_method(route, method)
+                ]
+            )
+            for method in [*complex_routes_methods, None]
+        }
+
+    def resolve(self, scope: Scope) -> tuple[BaseRoute, Scope] | None:
+        """
+        Returns the route fully matching the (HTTP) request, along with its child scope,
+        as Starlette's router would find it.
+        The returned child scopes may be shared between requests and must not be mutated.
+        """
+        static_route = self.static_routes.get((scope["method"], scope["path"]))
+        if static_route is not None:
+            return static_route
+
+        segments = scope["path"][1:].split("/")
+        found = self.root.find(scope["method"], segments)
+        found_index = found[0].index if found else len(self.routes)
+
+        # Routes outside of the trie registered before the found one take precedence
+        complex_routes_pattern = self.complex_routes_patterns.get(
+            scope["method"],
+            self.complex_routes_patterns[None],
+        )
+        complex_match = complex_routes_pattern and complex_routes_pattern.match(scope["path"])
+
+        if complex_match and complex_match.lastgroup:
+            complex_index = int(complex_match.lastgroup[1:])
+
+            if complex_index < found_index:
+                complex_route = self.routes[complex_index]
+                match, complex_child_scope = complex_route.matches(scope)
+                if match == Match.FULL:
+                    return complex_route, complex_child_scope
+
+        if found is None:
+            return None
+
+        indexed_route, param_values = found
+        route = indexed_route.route
+
+        path_params = dict(scope.get("path_params", {}))
+        path_params.update(zip(indexed_route.param_names, param_values))
+
+        child_scope: Scope = {"endpoint": route.endpoint, "path_params": path_params}
+        if isinstance(route, APIRoute):
+            child_scope["route"] = route
+
+        return route, child_scope
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope.get("root_path"):
+            await self.fallback(scope, receive, send)
+            return
+
+        if "router" not in scope:
+            scope["router"] = self.router
+
+        # A slot only holds the last request mapped to it, so a collision just means a new lookup.
+        # Concurrent requests may overwrite each other's slots, which has the same effect.
+        key = (scope["method"], scope["path"])
+        slot_index = hash(key) & (RESOLVED_CACHE_SIZE - 1)
+        slot = self.resolved_cache[slot_index]
+
+        if slot is not None and slot[0] == key:
+            resolved = slot[1]
+        else:
+            resolved = self.resolve(scope)
+            self.resolved_cache[slot_index] = (key, resolved)
+
+        if resolved is None:
+            await self.fallback(scope, receive, send)
+            return
+
+        route, child_scope = resolved
+        scope.update(child_scope)
+        await route.handle(scope, receive, send)
+
+
+def install_route_index(router: Router) -> None:
+    """
+    Dispatches the requests of the router through an index of its current routes.
+    The routes are frozen into a tuple, as any route added later would be bypassed by the index.
+    """
+    route_index = RouteIndex(router)
+    router.routes = route_index.routes  # type: ignore[assignment]
+    router.middleware_stack = route_index
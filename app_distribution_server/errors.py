@@ -1,4 +1,8 @@
-from fastapi import HTTPException, status
+from collections.abc import Awaitable, Callable
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
 
 class UserError(HTTPException):
@@ -42,3 +46,45 @@ status_codes_to_default_exception_types = {
     exception_type.STATUS_CODE: exception_type  # fmt: skip
     for exception_type in default_exception_types
 }
+
+# These are only presented, never raised, so a single instance of each is enough
+status_codes_to_default_exceptions: dict[int, UserError] = {
+    status_code: exception_type()
+    for status_code, exception_type in status_codes_to_default_exception_types.items()
+}
+
+
+def get_user_facing_error(exception: StarletteHTTPException) -> StarletteHTTPException:
+    """
+    Replaces the generic HTTP exceptions of the default status codes (ex: Starlette's 404)
+    by their user error, so that they are presented with its message.
+    """
+    if isinstance(exception, UserError):
+        return exception
+
+    return status_codes_to_default_exceptions.get(exception.status_code, exception)
+
+
+ErrorRenderer = Callable[[Request, StarletteHTTPException], Awaitable[Response]]
+
+
+def get_error_handling_route_class(render_error: ErrorRenderer) -> type[APIRoute]:
+    """
+    Creates a route class rendering the HTTP exceptions raised while handling its requests
+    with the given function, letting each router present its errors on its own.
+    Errors raised outside of the routes (ex: no route found) are left to the app exception handlers.
+    """
+
+    class ErrorHandlingRoute(APIRoute):
+        def get_route_handler(self) -> Callable[[Request], Awaitable[Response]]:
+            route_handler = super().get_route_handler()
+
+            async def error_handling_route_handler(request: Request) -> Response:
+                try:
+                    return await route_handler(request)
+                except StarletteHTTPException as exception:
+                    return await render_error(request, get_user_facing_error(exception))
+
+            return error_handling_route_handler
+
+    return ErrorHandlingRoute
@@ -0,0 +1,40 @@
+import hashlib
+
+import orjson
+from fastapi import FastAPI, Request, Response
+from starlette.routing import Route
+
+from app_distribution_server.static_files import is_etag_matching
+
+# Revalidated on every use, as the schema changes with each deployment. That's a cheap 304.
+OPENAPI_CACHE_CONTROL = "no-cache"
+
+
+def install_cached_openapi_route(app: FastAPI) -> None:
+    """
+    Replaces the route serving the OpenAPI schema, which encodes it on every request,
+    by one serving it from bytes encoded once, with an ETag for conditional requests.
+    Must be called once all the routes have been added.
+    """
+    openapi_url = app.openapi_url
+    if openapi_url is None:
+        return
+
+    body = orjson.dumps(app.openapi())
+    headers = {
+        "etag": f'"{hashlib.sha1(body, usedforsecurity=False).hexdigest()}"',
+        "cache-control": OPENAPI_CACHE_CONTROL,
+    }
+
+    for index, route in enumerate(app.router.routes):
+        if not isinstance(route, Route) or route.path != openapi_url:
+            continue
+
+        async def openapi(request: Request) -> Response:
+            if is_etag_matching(request.headers, headers["etag"]):
+                return Response(status_code=304, headers=headers)
+
+            return Response(content=body, media_type="application/json", headers=headers)
+
+        app.router.routes[index] = Route(openapi_url, openapi, include_in_schema=False)
+        return
@@ -11,13 +11,17 @@ from app_distribution_server.build_info import (
 from app_distribution_server.config import (
     get_absolute_url,
 )
+from app_distribution_server.routers.html_router import HtmlErrorHandlingRoute
 from app_distribution_server.storage import (
     get_upload_asserted_platform,
     load_app_file,
     load_build_info,
 )
 
-router = APIRouter(tags=["App files"])
+router = APIRouter(
+    tags=["App files"],
+    route_class=HtmlErrorHandlingRoute,
+)
 
 templates = Jinja2Templates(directory="templates")
 
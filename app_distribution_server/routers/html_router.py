@@ -7,22 +7,80 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 from app_distribution_server.build_info import (
     Platform,
 )
+from app_distribution_server.compression import PrecompressedBody
 from app_distribution_server.config import (
     APP_TITLE,
     LOGO_URL,
     get_absolute_url,
 )
+from app_distribution_server.errors import (
+    get_error_handling_route_class,
+    status_codes_to_default_exceptions,
+)
 from app_distribution_server.qrcode import get_qr_code_svg
 from app_distribution_server.storage import (
     get_upload_asserted_platform,
     load_build_info,
 )
 
-router = APIRouter(tags=["HTML page handling"])
-
 templates = Jinja2Templates(directory="templates")
 
 
+def get_error_page_context(user_error: FastApiHTTPException | StarletteHTTPException) -> dict:
+    return {
+        "page_title": user_error.detail,
+        "error_message": f"{user_error.status_code} - {user_error.detail}",
+    }
+
+
+# The error page doesn't depend on the request, so the default errors are rendered only once
+_prerendered_error_pages: dict[tuple[int, str], PrecompressedBody] = {
+    (status_code, exception.detail): PrecompressedBody(
+        templates.get_template("error.jinja.html")
+        .render(get_error_page_context(exception))
+        .encode(),
+    )
+    for status_code, exception in status_codes_to_default_exceptions.items()
+}
+
+
+async def render_error_page(
+    request: Request,
+    user_error: FastApiHTTPException | StarletteHTTPException,
+) -> Response:
+    prerendered_error_page = _prerendered_error_pages.get(
+        (user_error.status_code, user_error.detail),
+    )
+    if prerendered_error_page is not None:
+        body, content_encoding = prerendered_error_page.get_encoded_body(
+            request.headers.get("accept-encoding", ""),
+        )
+        headers = {"vary": "accept-encoding"}
+        if content_encoding is not None:
+            headers["content-encoding"] = content_encoding
+
+        return HTMLResponse(
+            content=body,
+            status_code=user_error.status_code,
+            headers=headers,
+        )
+
+    return templates.TemplateResponse(
+        request=request,
+        status_code=user_error.status_code,
+        name="error.jinja.html",
+        context=get_error_page_context(user_error),
+    )
+
+
+HtmlErrorHandlingRoute = get_error_handling_route_class(render_error_page)
+
+router = APIRouter(
+    tags=["HTML page handling"],
+    route_class=HtmlErrorHandlingRoute,
+)
+
+
 @router.get(
     "/get/{upload_id}",
     response_class=HTMLResponse,
@@ -53,18 +111,3 @@ async def render_get_item_installation_page(
             "logo_url": LOGO_URL,
         },
     )
-
-
-async def render_error_page(
-    request: Request,
-    user_error: FastApiHTTPException | StarletteHTTPException,
-) -> Response:
-    return templates.TemplateResponse(
-        request=request,
-        status_code=user_error.status_code,
-        name="error.jinja.html",
-        context={
-            "page_title": user_error.detail,
-            "error_message": f"{user_error.status_code} - {user_error.detail}",
-        },
-    )
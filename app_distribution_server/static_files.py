@@ -0,0 +1,151 @@
+import hashlib
+import os
+from mimetypes import guess_type
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from app_distribution_server.compression import PrecompressedBody
+
+STATIC_FILES_CACHE_CONTROL = "public, max-age=3600"
+
+
+class StaticFile:
+    def __init__(self, full_path: str):
+        self.full_path = full_path
+        self.stat_result = os.stat(full_path)
+        self.media_type = guess_type(full_path)[0] or "text/plain"
+
+        with open(full_path, "rb") as file:
+            self.precompressed_body = PrecompressedBody(file.read())
+
+        self.digest = hashlib.sha1(self.precompressed_body.body, usedforsecurity=False).hexdigest()
+
+    def get_etag(self, content_encoding: str | None) -> str:
+        return get_etag(self.digest, content_encoding)
+
+
+def get_etag(digest: str, content_encoding: str | None) -> str:
+    """
+    The ETag of a body (by digest) as sent with the given content encoding,
+    as each encoding of it is a different representation.
+    """
+    if content_encoding is None:
+        return f'"{digest}"'
+
+    return f'"{digest}-{content_encoding}"'
+
+
+def is_etag_matching(request_headers: Headers, etag: str) -> bool:
+    if_none_match = request_headers.get("if-none-match", "")
+    return etag in [tag.strip() for tag in if_none_match.split(",")]
+
+
+class StaticContent:
+    """
+    Content that doesn't change while the server is running (ex: a page), served from memory
+    with an ETag hashed from it, and compressed (once) for the clients accepting it.
+    """
+
+    def __init__(
+        self,
+        body: bytes,
+        *,
+        media_type: str,
+        cache_control: str = STATIC_FILES_CACHE_CONTROL,
+    ):
+        self.precompressed_body = PrecompressedBody(body)
+        self.media_type = media_type
+        self.digest = hashlib.sha1(body, usedforsecurity=False).hexdigest()
+        self.cache_control = cache_control
+
+    @classmethod
+    def from_file(
+        cls,
+        full_path: str,
+        *,
+        cache_control: str = STATIC_FILES_CACHE_CONTROL,
+    ) -> "StaticContent":
+        with open(full_path, "rb") as file:
+            body = file.read()
+
+        return cls(
+            body,
+            media_type=guess_type(full_path)[0] or "text/plain",
+            cache_control=cache_control,
+        )
+
+    def get_response(self, request_headers: Headers) -> Response:
+        body, content_encoding = self.precompressed_body.get_encoded_body(
+            request_headers.get("accept-encoding", ""),
+        )
+        etag = get_etag(self.digest, content_encoding)
+        headers = {
+            "etag": etag,
+            "cache-control": self.cache_control,
+            "vary": "accept-encoding",
+        }
+
+        if is_etag_matching(request_headers, etag):
+            return Response(status_code=304, headers=headers)
+
+        if content_encoding is not None:
+            headers["content-encoding"] = content_encoding
+
+        return Response(content=body, media_type=self.media_type, headers=headers)
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    Serves a directory of static files that do not change while the server is running.
+    The files are indexed on startup, with an ETag hashed from their contents, so that serving
+    them (or answering conditional requests with a 304) does not need to look them up on disk.
+    They are compressed at the same time, and served compressed to the clients accepting it.
+    Files missing from the index are served as usual.
+    """
+
+    def __init__(self, *, directory: str):
+        super().__init__(directory=directory)
+        self.static_files: dict[str, StaticFile] = {}
+
+        for dir_path, _, file_names in os.walk(directory):
+            for file_name in file_names:
+                full_path = os.path.join(dir_path, file_name)
+                path = os.path.relpath(full_path, directory)
+                self.static_files[path] = StaticFile(full_path)
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        static_file = self.static_files.get(path)
+
+        if static_file is None or scope["method"] not in ("GET", "HEAD"):
+            return await super().get_response(path, scope)
+
+        request_headers = Headers(scope=scope)
+        body, content_encoding = static_file.precompressed_body.get_encoded_body(
+            request_headers.get("accept-encoding", ""),
+        )
+        headers = {
+            "etag": static_file.get_etag(content_encoding),
+            "cache-control": STATIC_FILES_CACHE_CONTROL,
+            "vary": "accept-encoding",
+        }
+
+        if content_encoding is None:
+            response: Response = FileResponse(
+                static_file.full_path,
+                headers=headers,
+                stat_result=static_file.stat_result,
+            )
+        else:
+            response = Response(
+                content=body,
+                media_type=static_file.media_type,
+                headers={**headers, "content-encoding": content_encoding},
+            )
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+
+        return response
@@ -1,9 +1,21 @@
 import json
 import datetime
-
+import threading
+import uuid
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import BinaryIO, TypedDict
+
+import orjson
 from fs import errors, open_fs, path
 
-from app_distribution_server.build_info import BuildInfo, LegacyAppInfo, Platform
+from app_distribution_server.build_info import (
+    APP_FILE_CHUNK_SIZE,
+    BuildInfo,
+    LegacyAppInfo,
+    Platform,
+)
 from app_distribution_server.config import STORAGE_URL
 from app_distribution_server.errors import NotFoundError
 from app_distribution_server.logger import logger
@@ -12,6 +24,9 @@ PLIST_FILE_NAME = "info.plist"
 BUILD_INFO_JSON_FILE_NAME = "build_info.json"
 LEGACY_BUILD_INFO_JSON_FILE_NAME = "app_info.json"
 INDEXES_DIRECTORY = "_indexes"
+UPLOADS_INDEX_FILE_PATH = f"{INDEXES_DIRECTORY}/uploads.json"
+UPLOADS_INDEX_VERSION_FILE_PATH = f"{INDEXES_DIRECTORY}/uploads_version.txt"
+UPLOADS_INDEX_BUILD_WORKERS = 16
 
 
 filesystem = open_fs(STORAGE_URL, create=True)
@@ -21,11 +36,17 @@ def create_parent_directories(upload_id: str):
     filesystem.makedirs(upload_id, recreate=True)
 
 
-def save_upload(build_info: BuildInfo, app_file_content: bytes, tags: list[str] = None):
+def save_upload(build_info: BuildInfo, app_file: BinaryIO, tags: list[str] = None) -> dict:
+    """
+    Stores the app file along with its build info, and returns the build info as JSON.
+    The upload is listed once added to the index with `uploads_index.set_upload`, which rewrites
+    the index as a whole, so it's left to the caller (ex: to be done after responding).
+    """
     create_parent_directories(build_info.upload_id)
-    save_build_info(build_info, tags)
-    save_app_file(build_info, app_file_content)
+    build_info_json = save_build_info(build_info, tags)
+    save_app_file(build_info, app_file)
     set_latest_build(build_info)
+    return build_info_json
 
 
 def get_upload_platform(upload_id: str) -> Platform | None:
@@ -54,17 +75,24 @@ def get_upload_asserted_platform(
     raise NotFoundError()
 
 
-def save_build_info(build_info: BuildInfo, tags: list[str] = None):
-    upload_id = build_info.upload_id
-    filepath = f"{upload_id}/{BUILD_INFO_JSON_FILE_NAME}"
-    data = build_info.model_dump() if hasattr(build_info, "model_dump") else build_info.__dict__.copy()
+def get_build_info_json(build_info: BuildInfo, tags: list[str] | None = None) -> dict:
+    data = build_info.model_dump()
+    data["platform"] = build_info.platform.value
     if tags is not None:
         data["tags"] = sorted(tags)
     # Convert datetime fields to ISO format
     if "created_at" in data and isinstance(data["created_at"], datetime.datetime):
         data["created_at"] = data["created_at"].isoformat()
+    return data
+
+
+def save_build_info(build_info: BuildInfo, tags: list[str] = None) -> dict:
+    upload_id = build_info.upload_id
+    filepath = f"{upload_id}/{BUILD_INFO_JSON_FILE_NAME}"
+    data = get_build_info_json(build_info, tags)
     with filesystem.open(filepath, "w") as app_info_file:
         json.dump(data, app_info_file, indent=2)
+    return data
 
 
 def load_build_info(upload_id: str) -> BuildInfo:
@@ -119,10 +147,10 @@ def get_app_file_path(
 
 def save_app_file(
     build_info: BuildInfo,
-    app_file: bytes,
+    app_file: BinaryIO,
 ):
-    with filesystem.open(get_app_file_path(build_info), "wb+") as writable_app_file:
-        writable_app_file.write(app_file)
+    app_file.seek(0)
+    filesystem.upload(get_app_file_path(build_info), app_file, chunk_size=APP_FILE_CHUNK_SIZE)
 
 
 def load_app_file(
@@ -140,6 +168,8 @@ def delete_upload(upload_id: str):
         logger.error(f"Failed to delete upload directory {upload_id!r}: {e}")
         raise
 
+    uploads_index.set_upload(upload_id, None)
+
 
 def get_latest_upload_by_bundle_id_filepath(bundle_id):
     return path.join(INDEXES_DIRECTORY, "latest_upload_by_bundle_id", f"{bundle_id}.txt")
@@ -164,20 +194,249 @@ def get_latest_upload_id_by_bundle_id(bundle_id: str) -> str | None:
     with filesystem.open(filepath, "r") as file:
         return file.readline().strip()
     
+def list_uploaded_files(upload_id: str) -> list[str]:
+    """
+    Returns the names of the files of an upload, leaving out the hidden ones and its JSON metadata.
+    """
+    return [
+        file_name
+        for file_name in filesystem.listdir(upload_id)
+        if not file_name.startswith(".") and not file_name.endswith(".json")
+    ]
+
+
+def list_upload_ids() -> list[str]:
+    return [
+        entry.name
+        for entry in filesystem.scandir("/")
+        if entry.is_dir and not entry.name.startswith("_")
+    ]
+
+
 def list_all_uploaded_files():
     """
-    Returns a list of all files uploaded so far, grouped by upload_id.
+    Returns a list of all files uploaded so far (see `list_uploaded_files`), grouped by upload_id.
     Example return: { 'upload_id1': ['file1', 'file2'], ... }
     """
-    uploads = {}
-    for entry in filesystem.scandir("/"):
-        if entry.is_dir and not entry.name.startswith("_"):
-            upload_id = entry.name
-            uploads[upload_id] = filesystem.listdir(upload_id)
-    return uploads
+    return {upload_id: list_uploaded_files(upload_id) for upload_id in list_upload_ids()}
+
+class IndexedUpload(TypedDict):
+    # As saved to the build info JSON file, always with its tags
+    build_info: dict
+    # App files only (see `list_uploaded_files`)
+    files: list[str]
+
+
+def load_upload_to_index(upload_id: str) -> IndexedUpload | None:
+    """
+    Returns the upload as indexed, or `None` when it can't be loaded (ex: deleted meanwhile).
+    """
+    try:
+        return {
+            "build_info": get_build_info_json(load_build_info(upload_id)),
+            "files": list_uploaded_files(upload_id),
+        }
+    except Exception:
+        if not filesystem.exists(upload_id):
+            logger.info(f"Upload {upload_id!r} not indexed, it was deleted")
+        else:
+            logger.warning(f"Upload {upload_id!r} not indexed, it can't be loaded")
+        return None
+
+
+def load_uploads_index() -> dict[str, IndexedUpload] | None:
+    """
+    Returns the uploads index as stored, or `None` when it's missing or can't be decoded.
+    """
+    try:
+        return orjson.loads(filesystem.readbytes(UPLOADS_INDEX_FILE_PATH))
+    except errors.ResourceNotFound:
+        return None
+    except orjson.JSONDecodeError:
+        logger.warning("The uploads index can't be decoded, rebuilding it")
+        return None
+
+
+def load_uploads_index_version() -> str | None:
+    try:
+        return filesystem.readtext(UPLOADS_INDEX_VERSION_FILE_PATH)
+    except errors.ResourceNotFound:
+        return None
+
+
+def reconcile_uploads_index(
+    uploads: dict[str, IndexedUpload] | None,
+) -> dict[str, IndexedUpload]:
+    """
+    Returns the uploads index (built from scratch when `None`) along with the uploads stored
+    but missing from it, and without the uploads no longer stored.
+    Only the upload directories are listed, the build infos of the indexed uploads aren't read.
+    """
+    upload_ids = list_upload_ids()
+    stored_upload_ids = set(upload_ids)
+    indexed_uploads = uploads or {}
+    missing_upload_ids = [
+        upload_id for upload_id in upload_ids if upload_id not in indexed_uploads
+    ]
+
+    if uploads is None:
+        logger.info("Building the uploads index from the existing uploads")
+    elif missing_upload_ids:
+        logger.info(f"Indexing {len(missing_upload_ids)} uploads missing from the uploads index")
+
+    # The build infos are read from the storage concurrently, as that's mostly waiting on I/O
+    with ThreadPoolExecutor(max_workers=UPLOADS_INDEX_BUILD_WORKERS) as executor:
+        missing_uploads = executor.map(load_upload_to_index, missing_upload_ids)
+
+    reconciled_uploads = {
+        upload_id: upload
+        for upload_id, upload in indexed_uploads.items()
+        if upload_id in stored_upload_ids
+    }
+    for upload_id, upload in zip(missing_upload_ids, missing_uploads, strict=True):
+        if upload is not None:
+            reconciled_uploads[upload_id] = upload
+
+    return reconciled_uploads
+
+
+def save_uploads_index(uploads: dict[str, IndexedUpload]) -> str:
+    """
+    Stores the uploads index along with a new version, which is returned.
+    The version is written last, so that whoever reads it finds an index at least as recent.
+    """
+    filesystem.makedirs(INDEXES_DIRECTORY, recreate=True)
+    # Encoded as a whole on every upload, hence orjson
+    filesystem.writebytes(UPLOADS_INDEX_FILE_PATH, orjson.dumps(uploads))
+
+    version = uuid.uuid4().hex
+    filesystem.writetext(UPLOADS_INDEX_VERSION_FILE_PATH, version)
+    return version
+
+
+class UploadsSnapshot:
+    """
+    The uploads index at a given version, never mutated, so that a listing (and its ETag)
+    is built from a single consistent state.
+    """
+
+    def __init__(self, version: str, uploads: dict[str, IndexedUpload]):
+        self.version = version
+        self.uploads = uploads
+        # IDs of the uploads having each tag, derived from the uploads when first needed.
+        # Deriving it twice (ex: concurrently) just gives the same dict.
+        self.upload_ids_by_tag: dict[str, frozenset[str]] | None = None
+
+    def get_upload_ids_by_tag(self) -> dict[str, frozenset[str]]:
+        if self.upload_ids_by_tag is None:
+            upload_ids_by_tag: dict[str, set[str]] = {}
+            for upload_id, upload in self.uploads.items():
+                for tag in upload["build_info"]["tags"]:
+                    upload_ids_by_tag.setdefault(tag, set()).add(upload_id)
+
+            self.upload_ids_by_tag = {
+                tag: frozenset(upload_ids) for tag, upload_ids in upload_ids_by_tag.items()
+            }
+
+        return self.upload_ids_by_tag
+
+    def find_uploads(
+        self,
+        platform: str | None = None,
+        tags: set[str] | None = None,
+    ) -> Iterator[tuple[str, IndexedUpload]]:
+        """
+        Yields the uploads of the platform having all the tags, in the order of the index.
+        """
+        uploads = self.uploads
+        upload_ids: Iterable[str] = uploads
+
+        if tags:
+            upload_ids_by_tag = self.get_upload_ids_by_tag()
+            tagged_upload_ids: frozenset[str] | None = None
+
+            # Starting from the rarest tag, stopping as soon as no upload has all of them
+            for tag in sorted(tags, key=lambda tag: len(upload_ids_by_tag.get(tag, ()))):
+                tag_upload_ids = upload_ids_by_tag.get(tag, frozenset())
+                if tagged_upload_ids is None:
+                    tagged_upload_ids = tag_upload_ids
+                else:
+                    tagged_upload_ids = tagged_upload_ids & tag_upload_ids
+
+                if not tagged_upload_ids:
+                    return
+
+            upload_ids = [upload_id for upload_id in uploads if upload_id in tagged_upload_ids]
+
+        for upload_id in upload_ids:
+            upload = uploads[upload_id]
+            if platform is None or upload["build_info"]["platform"] == platform:
+                yield upload_id, upload
+
+
+class UploadsIndex:
+    """
+    Build info (as JSON) and file names of each upload, by upload ID, so that listing the uploads
+    reads a single file, loaded on first use and reloaded whenever its stored version changes
+    (ex: written by another instance sharing the storage).
+    The snapshot is replaced as a whole on every change (under the lock).
+    The version is unique across restarts and instances, so that it can be used as an ETag.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.snapshot: UploadsSnapshot | None = None
+
+    def sync(self) -> UploadsSnapshot:
+        """
+        Reloads the index when its stored version changed, and returns it.
+        On first load, the index is also checked against the upload directories, which may hold
+        uploads it missed (ex: if the process died before indexing them).
+        """
+        with self.lock:
+            stored_version = load_uploads_index_version()
+            if self.snapshot is not None and stored_version == self.snapshot.version:
+                return self.snapshot
+
+            uploads = load_uploads_index()
+
+            if self.snapshot is None or uploads is None or stored_version is None:
+                reconciled_uploads = reconcile_uploads_index(uploads)
+                if reconciled_uploads != uploads or stored_version is None:
+                    stored_version = save_uploads_index(reconciled_uploads)
+                uploads = reconciled_uploads
+
+            self.snapshot = UploadsSnapshot(stored_version, uploads)
+            return self.snapshot
+
+    def set_upload(self, upload_id: str, build_info_json: dict | None):
+        """
+        Indexes the upload with its build info, or removes it from the index when `None`.
+        The change is made to the index as stored rather than to the loaded one, which may miss
+        the changes of other instances, and the uploads the stored index misses are added back.
+        """
+        with self.lock:
+            uploads = load_uploads_index() or {}
+
+            if build_info_json is None:
+                uploads.pop(upload_id, None)
+            else:
+                uploads[upload_id] = {
+                    "build_info": build_info_json,
+                    "files": list_uploaded_files(upload_id),
+                }
+
+            uploads = reconcile_uploads_index(uploads)
+            self.snapshot = UploadsSnapshot(save_uploads_index(uploads), uploads)
+
+
+uploads_index = UploadsIndex()
+
 
 TAGS_FILE_PATH = "_indexes/tags.json"
 
+# Read from the storage on every use, as other instances sharing it may change the tags.
+# The file is tiny, so reading a version file to validate a cache wouldn't be any cheaper.
 def load_tags() -> set[str]:
     if not filesystem.exists(TAGS_FILE_PATH):
         return set()
@@ -193,13 +452,17 @@ def save_tags(tags: set[str]):
     with filesystem.open(TAGS_FILE_PATH, "w") as f:
         json.dump(sorted(tags), f)
 
+# Held while changing the tags, so that concurrent changes don't overwrite each other
+tags_lock = threading.Lock()
+
 def add_tag(tag: str):
-    tags = load_tags()
-    if tag in tags:
-        return False
-    tags.add(tag)
-    save_tags(tags)
-    return True
+    with tags_lock:
+        tags = load_tags()
+        if tag in tags:
+            return False
+        tags.add(tag)
+        save_tags(tags)
+        return True
 
 def get_all_tags() -> list[str]:
     return sorted(load_tags())
@@ -207,14 +470,22 @@ def get_all_tags() -> list[str]:
 def tag_exists(tag: str) -> bool:
     return tag in load_tags()
 
-def update_tag(old_tag: str, new_tag: str):
-    tags = load_tags()
-    if old_tag not in tags or new_tag in tags:
-        return False
-    tags.remove(old_tag)
-    tags.add(new_tag)
-    save_tags(tags)
-    return True
+class TagUpdateResult(Enum):
+    updated = "updated"
+    old_tag_not_found = "old_tag_not_found"
+    new_tag_exists = "new_tag_exists"
+
+def update_tag(old_tag: str, new_tag: str) -> TagUpdateResult:
+    with tags_lock:
+        tags = load_tags()
+        if old_tag not in tags:
+            return TagUpdateResult.old_tag_not_found
+        if new_tag in tags:
+            return TagUpdateResult.new_tag_exists
+        tags.remove(old_tag)
+        tags.add(new_tag)
+        save_tags(tags)
+        return TagUpdateResult.updated
 
 UPLOAD_TAGS_DIR = "_indexes/upload_tags"
 